@@ -1,17 +1,36 @@
+from __future__ import annotations
+
 import rich_click as click
 
+from functools import lru_cache
 from pathlib import Path
-from rich.console import Console
-from rich.prompt import Confirm
-from rich.table import Table
-from rich.box import HORIZONTALS
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from .cp2_config import CP2Config
+
+
+@lru_cache(maxsize=1)
+def get_config() -> CP2Config:
+    """Load the CP2 configuration on first use."""
+    from .cp2_config import CP2Config
+
+    return CP2Config()
 
-from .interactive import interactive
-from .interactive_fzf import interactive_fzf
-from .cp2_config import CP2Config
 
-cp2_config = CP2Config()
-console = Console()
+@lru_cache(maxsize=1)
+def get_console() -> Console:
+    """Create the shared console on first use."""
+    from rich.console import Console
+
+    return Console()
+
+
+def print_error(message: str) -> None:
+    """Print an error message in a single console write."""
+    get_console().print(f"[red]Error:[/] {message}")
 
 
 @click.group()
@@ -35,11 +54,13 @@ def mark():
 @click.option("-d", "--desc", help="Description for the mark")
 def mark_add(path, name, desc, **options):
     """Add a new mark bookmark."""
+    from rich.prompt import Confirm
 
     # Use option values if provided, otherwise use positional arguments
     final_path = options.get("path") or path
     final_name = options.get("name") or name
     final_desc = options.get("desc") or desc
+    cp2_config = get_config()
 
     if cp2_config.has_mark(final_name):
         if not Confirm.ask(
@@ -50,17 +71,17 @@ def mark_add(path, name, desc, **options):
     # Validate the path
     resolve_path = Path(final_path).resolve()
     if not resolve_path.exists():
-        console.print(f"[red]Error:[/] Path '{final_path}' does not exist.")
+        print_error(f"Path '{final_path}' does not exist.")
         return
 
     if not resolve_path.is_dir():
-        console.print(f"[red]Error:[/] Path '{final_path}' is not a directory.")
+        print_error(f"Path '{final_path}' is not a directory.")
         return
 
     # Add the mark to the configuration
     cp2_config.add_mark(final_name, str(resolve_path), final_desc)
 
-    console.print(
+    get_console().print(
         f"Adding mark '{final_name}' with path '{final_path}' and description '{final_desc}'"
     )
 
@@ -70,19 +91,24 @@ def mark_add(path, name, desc, **options):
 def mark_remove(name):
     """Remove a mark bookmark by name."""
 
-    console.print(f"Removing mark '{name}'")
+    cp2_config = get_config()
     if not cp2_config.has_mark(name):
-        console.print(f"[red]Error:[/] Mark '{name}' does not exist.")
+        print_error(f"Mark '{name}' does not exist.")
         return
     cp2_config.remove_mark(name)
-    console.print(f"[green]Successfully removed mark '{name}'[/green]")
+    get_console().print(
+        f"Removing mark '{name}'\n[green]Successfully removed mark '{name}'[/green]"
+    )
 
 
 @mark.command("list")
 def mark_list():
     """List all mark bookmarks."""
+    from rich.box import HORIZONTALS
+    from rich.table import Table
 
-    marks = cp2_config.list_marks()
+    console = get_console()
+    marks = get_config().list_marks()
     if not marks:
         console.print("[yellow]No marks found. 😥[/yellow]")
         return
@@ -101,13 +127,17 @@ def mark_list():
 @main.command()
 def start():
     """Start CP2 interactive interface."""
-    interactive(cp2_config, console)
+    from .interactive import interactive
+
+    interactive(get_config(), get_console())
 
 
 @main.command()
 def fzf():
     """Start CP2 interactive interface."""
-    interactive_fzf(cp2_config, console)
+    from .interactive_fzf import interactive_fzf
+
+    interactive_fzf(get_config(), get_console())
 
 
 if __name__ == "__main__":
@@ -1,92 +1,114 @@
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass, field, is_dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, List
-import toml
-from platformdirs import user_config_dir
-from pydantic import BaseModel, Field, ValidationError, field_validator
-from rich.console import Console
+from typing import TYPE_CHECKING, Any, Dict, Optional, List
+import tomllib
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@lru_cache(maxsize=1)
+def _get_console() -> Console:
+    """创建一个控制台实例，用于输出（首次使用时才导入 rich）"""
+    from rich.console import Console
+
+    return Console()
+
+
+# 查找配置时表示键不存在
+_MISSING = object()
+
+# 配置缓存格式版本，模型结构发生变化时需要递增
+_CACHE_VERSION = 2
 
-# 创建一个控制台实例，用于输出
-console = Console()
+
+def _atomic_write(path: Path, data: bytes):
+    """
+    先写入临时文件再替换目标文件，避免中断时留下损坏的文件
+
+    临时文件名唯一，多个进程同时保存时不会互相覆盖；替换失败时删除临时文件。
+    """
+    import tempfile
+
+    tmp_file = tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+    )
+    try:
+        with tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_file.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_file.name)
+        except OSError:
+            pass
+        raise
+
+
+# 默认排除的文件模式
+_DEFAULT_PATTERNS = (
+    "*.pyc",
+    "__pycache__/",
+    ".git/",
+    ".vscode/",
+    ".idea/",
+    ".DS_Store",
+    "node_modules/",
+    "dist/",
+    "build/",
+    ".env",
+    ".venv/",
+    "venv/",
+    "env/",
+)
 
 
 # 定义配置模型
-class ExcludeConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ExcludeConfig:
     """排除配置模型"""
 
-    patterns: List[str] = Field(
-        default_factory=lambda: [
-            "*.pyc",
-            "__pycache__/",
-            ".git/",
-            ".vscode/",
-            ".idea/",
-            ".DS_Store",
-            "node_modules/",
-            "dist/",
-            "build/",
-            ".env",
-            ".venv/",
-            "venv/",
-            "env/",
-        ],
-        description="排除的文件模式列表",
-    )
-    ignore_file: str = Field(default=".gitignore", description="忽略文件名")
-
-    @field_validator("patterns")
-    @classmethod
-    def validate_patterns(cls, v):
-        """验证模式列表并去重"""
-        if not isinstance(v, list):
-            raise ValueError("patterns 必须是一个列表")
-        if not all(isinstance(pattern, str) for pattern in v):
-            raise ValueError("patterns 中的所有项目都必须是字符串")
-        # 去重并保持顺序
-        seen = set()
-        unique_patterns = []
-        for pattern in v:
-            if pattern not in seen:
-                seen.add(pattern)
-                unique_patterns.append(pattern)
-        return unique_patterns
-
-    @field_validator("ignore_file")
-    @classmethod
-    def validate_ignore_file(cls, v):
-        """验证忽略文件名"""
-        if not isinstance(v, str):
-            raise ValueError("ignore_file 必须是字符串")
-        if not v.strip():
-            raise ValueError("ignore_file 不能为空")
-        return v.strip()
-
-
-class MarkInfo(BaseModel):
+    # 排除的文件模式列表
+    patterns: List[str] = field(default_factory=lambda: list(_DEFAULT_PATTERNS))
+    # 忽略文件名
+    ignore_file: str = ".gitignore"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {"patterns": list(self.patterns), "ignore_file": self.ignore_file}
+
+
+@dataclass(frozen=True, slots=True)
+class MarkInfo:
     """单个项目的信息模型"""
 
-    path: str = Field(description="项目路径")
-    description: Optional[str] = Field(default=None, description="项目描述")
+    # 项目路径
+    path: str
+    # 项目描述
+    description: Optional[str] = None
 
-    @field_validator("path")
-    @classmethod
-    def validate_path(cls, v):
-        """验证项目路径"""
-        if not isinstance(v, str):
-            raise ValueError("path 必须是字符串")
-        if not v.strip():
-            raise ValueError("path 不能为空")
-        return v.strip()
+    def to_dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """转换为字典，exclude_none 为 True 时去掉空值"""
+        if exclude_none and self.description is None:
+            return {"path": self.path}
+        return {"path": self.path, "description": self.description}
 
 
-class MarkConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class MarkConfig:
     """项目配置模型 - 使用字典存储项目信息"""
 
-    marks: Dict[str, MarkInfo] = Field(default_factory=dict, description="项目配置字典")
+    # 项目配置字典
+    marks: Dict[str, MarkInfo] = field(default_factory=dict)
 
     def add_mark(self, name: str, path: str, description: Optional[str] = None):
         """添加项目"""
-        mark_info = MarkInfo(path=path, description=description)
-        self.marks[name] = mark_info
+        self.marks[name] = _validate_mark_info(path, description)
 
     def remove_mark(self, name: str):
         """移除项目"""
@@ -101,24 +123,95 @@ class MarkConfig(BaseModel):
         """列出所有项目"""
         return self.marks.copy()
 
-    def model_dump(self, **kwargs) -> Dict[str, Any]:
-        """自定义序列化方法 - 直接返回项目字典而不是嵌套的 marks 键"""
-        result = {}
-        for name, mark_info in self.marks.items():
-            result[name] = mark_info.model_dump(**kwargs)
-        return result
+    def to_dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """直接返回项目字典而不是嵌套的 marks 键"""
+        return {
+            name: mark_info.to_dict(exclude_none)
+            for name, mark_info in self.marks.items()
+        }
 
 
-class CP2ConfigModel(BaseModel):
+@dataclass(frozen=True, slots=True)
+class CP2ConfigModel:
     """主配置模型"""
 
-    exclude: ExcludeConfig = Field(default_factory=ExcludeConfig)
-    mark: MarkConfig = Field(default_factory=MarkConfig)
+    exclude: ExcludeConfig = field(default_factory=ExcludeConfig)
+    mark: MarkConfig = field(default_factory=MarkConfig)
+
+    def to_dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """转换为与配置文件结构一致的字典"""
+        return {
+            "exclude": self.exclude.to_dict(),
+            "mark": self.mark.to_dict(exclude_none),
+        }
 
-    model_config = {
-        "extra": "allow",  # 允许额外字段
-        "validate_assignment": True,  # 赋值时验证
-    }
+
+def _validate_patterns(v: Any) -> List[str]:
+    """验证模式列表并去重"""
+    if not isinstance(v, list):
+        raise ValueError("patterns 必须是一个列表")
+    # 默认模式列表本身没有重复，直接返回
+    if tuple(v) == _DEFAULT_PATTERNS:
+        return list(v)
+    if not all(isinstance(pattern, str) for pattern in v):
+        raise ValueError("patterns 中的所有项目都必须是字符串")
+    # 去重并保持顺序
+    seen = set()
+    unique_patterns = []
+    for pattern in v:
+        if pattern not in seen:
+            seen.add(pattern)
+            unique_patterns.append(pattern)
+    return unique_patterns
+
+
+def _validate_ignore_file(v: Any) -> str:
+    """验证忽略文件名"""
+    if not isinstance(v, str):
+        raise ValueError("ignore_file 必须是字符串")
+    if not v.strip():
+        raise ValueError("ignore_file 不能为空")
+    return v.strip()
+
+
+def _validate_mark_info(path: Any, description: Any = None) -> MarkInfo:
+    """验证项目路径和描述"""
+    if not isinstance(path, str):
+        raise ValueError("path 必须是字符串")
+    if not path.strip():
+        raise ValueError("path 不能为空")
+    if description is not None and not isinstance(description, str):
+        raise ValueError("description 必须是字符串")
+    return MarkInfo(path=path.strip(), description=description)
+
+
+def _validate(raw: Dict[str, Any]) -> CP2ConfigModel:
+    """验证原始配置字典并构建配置模型，验证失败时抛出 ValueError"""
+    exclude = ExcludeConfig()
+    if "exclude" in raw:
+        raw_exclude = raw["exclude"]
+        if not isinstance(raw_exclude, dict):
+            raise ValueError("exclude 必须是一个表")
+        exclude = ExcludeConfig(
+            patterns=_validate_patterns(
+                raw_exclude.get("patterns", list(_DEFAULT_PATTERNS))
+            ),
+            ignore_file=_validate_ignore_file(
+                raw_exclude.get("ignore_file", ".gitignore")
+            ),
+        )
+
+    # 处理项目配置的特殊结构，跳过缺少 path 的项目
+    mark = MarkConfig()
+    raw_mark = raw.get("mark")
+    if isinstance(raw_mark, dict):
+        for mark_name, mark_data in raw_mark.items():
+            if isinstance(mark_data, dict) and "path" in mark_data:
+                mark.marks[mark_name] = _validate_mark_info(
+                    mark_data["path"], mark_data.get("description")
+                )
+
+    return CP2ConfigModel(exclude=exclude, mark=mark)
 
 
 class CP2Config:
@@ -128,51 +221,79 @@ class CP2Config:
 
         :param config_filename: 配置文件名，默认为 config.toml
         """
+        from platformdirs import user_config_dir
+
         # 获取跨平台配置目录
         self.config_dir = Path(user_config_dir("copy_to"))
         self.config_file = self.config_dir / config_filename
+        # 缓存解析并验证后的配置模型，避免每次启动都解析 TOML
+        self.cache_file = self.config_file.with_suffix(".cache.pkl")
 
         # 确保配置目录存在
         self.config_dir.mkdir(parents=True, exist_ok=True)
 
-        # 加载配置
-        self._config_model = self._load_config()
+        # 加载配置，缓存有效时跳过解析和验证
+        config_model = self._load_cache()
+        if config_model is None:
+            config_model = self._load_config()
+        self._config_model = config_model
+
+    def _load_cache(self) -> Optional[CP2ConfigModel]:
+        """从缓存文件加载配置模型，缓存不存在或已过期时返回 None"""
+        try:
+            stat = self.config_file.stat()
+            with open(self.cache_file, "rb") as f:
+                version, mtime_ns, size, payload = pickle.load(f)
+            if (version, mtime_ns, size) != (
+                _CACHE_VERSION,
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                return None
+            return pickle.loads(payload)
+        except Exception:
+            return None
+
+    def _save_cache(self, config_model: CP2ConfigModel):
+        """将配置模型写入缓存文件，并记录配置文件的 mtime 和大小"""
+        try:
+            stat = self.config_file.stat()
+            data = pickle.dumps(
+                (
+                    _CACHE_VERSION,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    pickle.dumps(config_model),
+                )
+            )
+            _atomic_write(self.cache_file, data)
+        except Exception:
+            # 缓存只用于加速启动，写入失败时不影响正常使用
+            pass
 
     def _load_config(self) -> CP2ConfigModel:
         """加载配置文件，返回验证后的配置模型"""
         try:
             if self.config_file.exists():
-                # 如果配置文件存在，读取并解析
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    raw_config = toml.load(f)
+                # 如果配置文件存在，一次性读入内存后再解析
+                raw_bytes = self.config_file.read_bytes()
+                raw_config = tomllib.loads(raw_bytes.decode("utf-8"))
 
-                # 使用 Pydantic 验证配置
+                # 验证配置
                 try:
-                    # 处理项目配置的特殊结构
-                    config_model = CP2ConfigModel()
+                    config_model = _validate(raw_config)
 
-                    # 设置排除配置
-                    if "exclude" in raw_config:
-                        config_model.exclude = ExcludeConfig(**raw_config["exclude"])
-
-                    # 设置项目配置
-                    if "mark" in raw_config and isinstance(raw_config["mark"], dict):
-                        mark_config = MarkConfig()
-                        for mark_name, mark_data in raw_config["mark"].items():
-                            if isinstance(mark_data, dict) and "path" in mark_data:
-                                mark_config.add_mark(
-                                    name=mark_name,
-                                    path=mark_data["path"],
-                                    description=mark_data.get("description"),
-                                )
-                        config_model.mark = mark_config
-
-                    # 保存验证后的配置回文件（修正任何格式问题）
-                    self._save_config(config_model)
+                    # 只有内容与规范格式不一致时才写回文件（修正任何格式问题）
+                    if self._serialize_config(config_model) != raw_bytes:
+                        self._save_config(config_model)
+                    else:
+                        self._save_cache(config_model)
                     return config_model
-                except ValidationError:
-                    console.print("[red]配置文件验证失败[/red]")
-                    console.print("[yellow]使用默认配置并重新创建配置文件[/yellow]")
+                except ValueError:
+                    _get_console().print("[red]配置文件验证失败[/red]")
+                    _get_console().print(
+                        "[yellow]使用默认配置并重新创建配置文件[/yellow]"
+                    )
                     config_model = CP2ConfigModel()
                     self._save_config(config_model)
                     return config_model
@@ -181,38 +302,39 @@ class CP2Config:
                 config_model = CP2ConfigModel()
                 self._save_config(config_model)
                 return config_model
-        except toml.TomlDecodeError:
-            console.print("[red]配置文件格式错误[/red]")
+        except tomllib.TOMLDecodeError:
+            _get_console().print("[red]配置文件格式错误[/red]")
             raise SystemExit()
         except Exception:
-            console.print("[red]加载配置文件失败[/red]")
+            _get_console().print("[red]加载配置文件失败[/red]")
             raise SystemExit()
 
+    def _serialize_config(self, config_model: CP2ConfigModel) -> bytes:
+        """将配置模型序列化为 TOML 字节串"""
+        import tomli_w
+
+        # TOML 不支持 None，需要去掉空值
+        config_dict = config_model.to_dict(exclude_none=True)
+        return tomli_w.dumps(config_dict).encode("utf-8")
+
     def _save_config(self, config_model: Optional[CP2ConfigModel] = None):
         """保存配置到文件"""
         try:
             if config_model is None:
                 config_model = self._config_model
 
-            # 将 Pydantic 模型转换为字典
-            config_dict = {
-                "exclude": config_model.exclude.model_dump(),
-                "mark": config_model.mark.model_dump(),
-            }
-
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                toml.dump(config_dict, f)
+            # 一次性写入临时文件后替换，中断时不会留下截断的配置文件
+            _atomic_write(self.config_file, self._serialize_config(config_model))
         except Exception:
-            console.print("[red]保存配置文件失败[/red]")
+            _get_console().print("[red]保存配置文件失败[/red]")
             raise SystemExit()
 
+        self._save_cache(config_model)
+
     @property
     def _config(self) -> Dict[str, Any]:
         """获取配置字典（向后兼容）"""
-        return {
-            "exclude": self._config_model.exclude.model_dump(),
-            "mark": self._config_model.mark.model_dump(),
-        }
+        return self._config_model.to_dict()
 
     def has_mark(self, name: str) -> bool:
         """
@@ -231,17 +353,41 @@ class CP2Config:
         :param default: 如果键不存在时返回的默认值
         :return: 配置值或默认值
         """
-        keys = key.split(".")
-        value = self._config
-
-        try:
-            for k in keys:
-                if not isinstance(value, dict):
-                    return default
-                value = value.get(k, {})
-            return value if value != {} else default
-        except Exception:
+        value = self._lookup(key)
+        if value is _MISSING:
             return default
+        return self._export(value)
+
+    def _lookup(self, key: str) -> Any:
+        """
+        直接在配置模型上逐级查找配置键，避免把整个模型转换为字典
+
+        :param key: 配置键，可以使用点表示法访问嵌套值
+        :return: 配置模型中的原始值，键不存在或项目配置为空时返回 _MISSING
+        """
+        value: Any = self._config_model
+        for k in key.split("."):
+            if isinstance(value, MarkConfig):
+                value = value.marks.get(k, _MISSING)
+            elif is_dataclass(value) and k in value.__dataclass_fields__:
+                value = getattr(value, k)
+            else:
+                return _MISSING
+            if value is _MISSING:
+                return _MISSING
+
+        if isinstance(value, MarkConfig) and not value.marks:
+            return _MISSING
+        return value
+
+    @staticmethod
+    def _export(value: Any) -> Any:
+        """返回与配置文件结构一致的副本，避免调用方直接修改配置模型"""
+        if isinstance(value, (ExcludeConfig, MarkInfo, MarkConfig)):
+            return value.to_dict()
+        if isinstance(value, list):
+            return list(value)
+        return value
 
     def set(self, key: str, value: Any, save: bool = True):
         """
@@ -252,7 +398,7 @@ class CP2Config:
         :param save: 是否立即保存到文件
         """
         # 获取当前配置字典
-        config_dict = self._config_model.model_dump()
+        config_dict = self._config_model.to_dict()
 
         # 设置新值
         keys = key.split(".")
@@ -265,13 +411,13 @@ class CP2Config:
 
         current[keys[-1]] = value
 
-        # 使用 Pydantic 验证新配置
+        # 验证新配置
         try:
-            self._config_model = CP2ConfigModel(**config_dict)
-            if save:
-                self._save_config()
-        except ValidationError as e:
+            self._config_model = _validate(config_dict)
+        except ValueError as e:
             raise ValueError(f"配置验证失败: {e}")
+        if save:
+            self._save_config()
 
     def delete(self, key: str, save: bool = True):
         """
@@ -280,7 +426,7 @@ class CP2Config:
         :param key: 要删除的配置键
         :param save: 是否立即保存到文件
         """
-        config_dict = self._config_model.model_dump()
+        config_dict = self._config_model.to_dict()
         keys = key.split(".")
         current = config_dict
 
@@ -292,29 +438,27 @@ class CP2Config:
         if keys[-1] in current:
             del current[keys[-1]]
             try:
-                self._config_model = CP2ConfigModel(**config_dict)
-                if save:
-                    self._save_config()
-            except ValidationError as e:
+                self._config_model = _validate(config_dict)
+            except ValueError as e:
                 raise ValueError(f"删除配置项后验证失败: {e}")
+            if save:
+                self._save_config()
 
     def validate_config(self) -> bool:
         """验证当前配置是否有效"""
         try:
             # 重新验证当前配置
-            config_dict = self._config_model.model_dump()
-            CP2ConfigModel(**config_dict)
+            _validate(self._config_model.to_dict())
             return True
-        except ValidationError:
+        except ValueError:
             return False
 
     def get_validation_errors(self) -> Optional[str]:
         """获取配置验证错误信息"""
         try:
-            config_dict = self._config_model.model_dump()
-            CP2ConfigModel(**config_dict)
+            _validate(self._config_model.to_dict())
             return None
-        except ValidationError as e:
+        except ValueError as e:
             return str(e)
 
     # 项目管理的便捷方法
@@ -335,12 +479,12 @@ class CP2Config:
     def get_mark(self, name: str) -> Optional[Dict[str, Any]]:
         """获取项目信息"""
         mark_info = self._config_model.mark.get_mark(name)
-        return mark_info.model_dump() if mark_info else None
+        return mark_info.to_dict() if mark_info else None
 
     def list_marks(self) -> Dict[str, Dict[str, Any]]:
         """列出所有项目"""
         marks = self._config_model.mark.list_marks()
-        return {name: info.model_dump() for name, info in marks.items()}
+        return {name: info.to_dict() for name, info in marks.items()}
 
     def mark_exists(self, name: str) -> bool:
         """检查项目是否存在"""
@@ -373,14 +517,15 @@ class CP2Config:
 
     def __contains__(self, key: str) -> bool:
         """检查配置键是否存在"""
-        return self.get(key, None) is not None
+        value = self._lookup(key)
+        return value is not _MISSING and value is not None
 
     def __getitem__(self, key: str) -> Any:
         """支持字典式访问"""
-        value = self.get(key)
-        if value is None:
+        value = self._lookup(key)
+        if value is _MISSING or value is None:
             raise KeyError(key)
-        return value
+        return self._export(value)
 
     def __setitem__(self, key: str, value: Any):
         """支持字典式设置"""
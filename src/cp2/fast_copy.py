@@ -0,0 +1,114 @@
+import errno
+import os
+import shutil
+import stat
+import sys
+from typing import Callable, Tuple
+
+# 回退到用户态复制时的缓冲区大小
+_COPY_BUFSIZE = 1 << 20
+
+# 这些错误表示当前文件系统或文件类型不支持该内核复制方式，可以换下一种方式继续
+_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.ENOTSOCK,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+}
+
+
+def _kernel_copy_funcs() -> Tuple[Callable[[int, int, int], int], ...]:
+    """按优先级返回当前平台可用的内核复制函数，参数为 (src_fd, dst_fd, count)"""
+    funcs = []
+    if hasattr(os, "copy_file_range"):
+        # 支持 reflink 的文件系统（btrfs、xfs 等）上可以直接共享数据块
+        funcs.append(
+            lambda src_fd, dst_fd, count: os.copy_file_range(src_fd, dst_fd, count)
+        )
+    # 只有 Linux 的 sendfile 支持 offset=None 且能写入普通文件，与 shutil 的判断一致
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        funcs.append(
+            lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count)
+        )
+    return tuple(funcs)
+
+
+_KERNEL_COPY_FUNCS = _kernel_copy_funcs()
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, blocksize: int) -> bool:
+    """
+    在内核中把 src_fd 剩余的内容复制到 dst_fd
+
+    两个文件描述符的读写位置都会随复制前进，因此某种方式中途失败时可以直接换下一种方式继续。
+
+    :return: 是否已复制完成，False 表示需要由调用方用普通读写完成剩余部分
+    """
+    for copy_chunk in _KERNEL_COPY_FUNCS:
+        copied = 0
+        try:
+            while True:
+                sent = copy_chunk(src_fd, dst_fd, blocksize)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+            continue
+        # 一个字节都没复制时可能是 /proc 这类报告大小为 0 的文件，交给普通读写处理
+        return copied > 0
+    return False
+
+
+def _check_copy_paths(src, dst):
+    """
+    与 shutil.copyfile 相同的检查：在打开目标文件之前拒绝同一文件和命名管道
+
+    目标是指向源文件的符号链接或硬链接时，以 "wb" 打开会直接清空源文件。
+    """
+    try:
+        same_file = os.path.samefile(src, dst)
+    except OSError:
+        same_file = False
+    if same_file:
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    for path in (src, dst):
+        try:
+            st = os.stat(path)
+        except OSError:
+            # 文件不存在时由后面的 open 报错或创建
+            continue
+        if stat.S_ISFIFO(st.st_mode):
+            raise shutil.SpecialFileError(f"`{path}` is a named pipe")
+
+
+def fast_copy2(src, dst):
+    """
+    复制文件内容和元数据，行为与 shutil.copy2 相同
+
+    优先使用 copy_file_range，其次 sendfile，中途不可用时以 1 MiB 缓冲区读写剩余部分。
+    没有可用内核复制方式的平台直接交给 shutil.copy2，保留 macOS 的 fcopyfile、Windows 的 CopyFile2 等优化。
+
+    :param src: 源文件路径
+    :param dst: 目标文件或目录路径
+    :return: 目标文件路径
+    """
+    if not _KERNEL_COPY_FUNCS:
+        return shutil.copy2(src, dst)
+
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    _check_copy_paths(src, dst)
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        blocksize = min(max(size, _COPY_BUFSIZE), 1 << 30)
+        if not _kernel_copy(fsrc.fileno(), fdst.fileno(), blocksize):
+            shutil.copyfileobj(fsrc, fdst, _COPY_BUFSIZE)
+    shutil.copystat(src, dst)
+    return dst
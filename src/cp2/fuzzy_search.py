@@ -1,101 +1,242 @@
-from typing import Dict, List, Tuple
+import heapq
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from operator import itemgetter
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple
 
+if TYPE_CHECKING:
+    from .load_files import FileCache
 
-def is_subsequence(query: str, text: str) -> bool:
+
+class _SearchIndex(NamedTuple):
+    """文件缓存的搜索索引"""
+
+    # 文件名、文件路径和小写文件名，三者一一对应
+    names: List[str]
+    paths: List[str]
+    lowers: List[str]
+    # 用空字符拼接的小写文件名，供正则引擎一次扫描
+    blob: str
+    # 每个文件名在 blob 中的起始位置
+    starts: List[int]
+
+
+# 最近一次使用的文件缓存及其搜索索引 (file_cache, len, index)
+_search_index: Tuple[Optional["FileCache"], int, Optional[_SearchIndex]] = (
+    None,
+    0,
+    None,
+)
+
+
+def find_subsequence_positions(
+    query_lower: str, text_lower: str
+) -> Optional[List[int]]:
     """
-    检查query是否是text的子序列（保持字符顺序）
+    查找query中每个字符在text中依次出现的位置，要求两者已经转换为小写
+    使用 str.find 逐字符跳跃查找，不是子序列时返回 None
     """
-    if not query:
-        return True
-    if not text:
-        return False
-
-    i = j = 0
-    query_lower = query.lower()
-    text_lower = text.lower()
+    positions = []
+    start = 0
+    for char in query_lower:
+        idx = text_lower.find(char, start)
+        if idx < 0:
+            return None
+        positions.append(idx)
+        start = idx + 1
+    return positions
 
-    while i < len(query_lower) and j < len(text_lower):
-        if query_lower[i] == text_lower[j]:
-            i += 1
-        j += 1
 
-    return i == len(query_lower)
+def is_subsequence(query: str, text: str) -> bool:
+    """
+    检查query是否是text的子序列（保持字符顺序）
+    """
+    return find_subsequence_positions(query.lower(), text.lower()) is not None
 
 
 def calculate_subsequence_score(query: str, text: str) -> int:
     """
     计算子序列匹配的得分
     """
-    if not is_subsequence(query, text):
+    return calculate_subsequence_score_lower(query.lower(), text.lower())
+
+
+def calculate_subsequence_score_lower(query_lower: str, text_lower: str) -> int:
+    """
+    计算子序列匹配的得分，要求 query 和 text 已经转换为小写
+    """
+    positions = find_subsequence_positions(query_lower, text_lower)
+    if positions is None:
         return 0
+    first, last = (positions[0], positions[-1]) if positions else (0, 0)
+    return _score_subsequence_span(len(query_lower), first, last)
 
-    query_lower = query.lower()
-    text_lower = text.lower()
 
+def _score_subsequence_span(query_len: int, first: int, last: int) -> int:
+    """
+    根据子序列首尾字符的位置计算得分
+    """
     # 基础得分
     base_score = 60
 
     # 计算字符间距离得分
-    positions = []
-    j = 0
-    for i, char in enumerate(query_lower):
-        while j < len(text_lower) and text_lower[j] != char:
-            j += 1
-        if j < len(text_lower):
-            positions.append(j)
-            j += 1
-
-    if len(positions) == len(query_lower):
-        # 计算平均间距
-        if len(positions) > 1:
-            total_distance = positions[-1] - positions[0]
-            ideal_distance = len(query_lower) - 1
-            if total_distance > 0:
-                distance_ratio = ideal_distance / total_distance
-                distance_score = min(30, int(distance_ratio * 30))
-            else:
-                distance_score = 30
+    if query_len > 1:
+        total_distance = last - first
+        ideal_distance = query_len - 1
+        if total_distance > 0:
+            distance_ratio = ideal_distance / total_distance
+            distance_score = min(30, int(distance_ratio * 30))
         else:
             distance_score = 30
+    else:
+        distance_score = 30
 
-        return base_score + distance_score
+    return base_score + distance_score
 
-    return 0
 
+def compile_subsequence_pattern(query_lower: str) -> re.Pattern:
+    """
+    将小写查询编译为子序列正则，如 "abc" -> "a[^b]*b[^c]*c"
+    匹配范围与 find_subsequence_positions 的首尾位置一致
+    字符间不跨越空字符，以便在拼接后的文件名中匹配时不会跨越文件边界
+    """
+    parts = []
+    for char, next_char in zip(query_lower, query_lower[1:]):
+        parts.append(f"{re.escape(char)}[^{re.escape(next_char)}\0]*")
+    parts.append(re.escape(query_lower[-1:]))
+    return re.compile("".join(parts), re.DOTALL)
 
-def fuzzy_search_files(
-    query: str, file_cache: Dict[str, str], max_results: int = 20
-) -> List[Tuple[str, str, int]]:
+
+def _build_search_index(
+    names: List[str], paths: List[str], lowers: List[str]
+) -> _SearchIndex:
     """
-    在文件缓存中进行模糊搜索
-    返回格式: [(filename, filepath, score), ...]
+    根据一一对应的文件名、文件路径和小写文件名构建搜索索引
     """
-    if not query:
-        return []
+    starts = list(accumulate((len(lower) + 1 for lower in lowers), initial=0))
+    return _SearchIndex(names, paths, lowers, "\0".join(lowers), starts)
 
-    query_lower = query.lower()
-    results = []
 
-    for filename, filepath in file_cache.items():
-        filename_lower = filename.lower()
-        score = 0
+def _get_search_index(file_cache: "FileCache") -> _SearchIndex:
+    """
+    获取文件缓存的搜索索引，同一个缓存只构建一次
+    """
+    global _search_index
+
+    cached_cache, cached_len, index = _search_index
+    if index is None or cached_cache is not file_cache or cached_len != len(file_cache):
+        index = _build_search_index(
+            file_cache.names, file_cache.paths, file_cache.names_lower
+        )
+        _search_index = (file_cache, len(file_cache), index)
+    return index
+
 
+def _search_subsequences(
+    pattern: re.Pattern, index: _SearchIndex
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    在所有文件名中查找子序列匹配，返回 (文件下标, 首字符位置, 尾字符位置)
+    整个扫描由正则引擎完成，只有命中的文件名才会回到 Python
+    """
+    last_index = -1
+    for match in pattern.finditer(index.blob):
+        i = bisect_right(index.starts, match.start()) - 1
+        # 同一文件名只取最左侧的匹配
+        if i == last_index:
+            continue
+        last_index = i
+        offset = index.starts[i]
+        yield i, match.start() - offset, match.end() - 1 - offset
+
+
+def _rank_matches(
+    query_lower: str,
+    index: _SearchIndex,
+    matches: List[Tuple[int, int, int]],
+    max_results: int,
+) -> List[Tuple[str, str, int]]:
+    """
+    按匹配方式为子序列匹配结果打分，返回得分最高的 max_results 个结果
+    """
+    query_len = len(query_lower)
+    exact, prefix, contains, subsequence = [], [], [], []
+    for i, first, last in matches:
+        filename, filepath = index.names[i], index.paths[i]
+        filename_lower = index.lowers[i]
         # 精确匹配得分最高
         if query_lower == filename_lower:
-            score = 100
+            exact.append((filename, filepath, 100))
         # 开头匹配
         elif filename_lower.startswith(query_lower):
-            score = 90
+            prefix.append((filename, filepath, 90))
         # 包含匹配
         elif query_lower in filename_lower:
-            score = 80
+            contains.append((filename, filepath, 80))
         # 子序列匹配（保持字符顺序）
         else:
-            score = calculate_subsequence_score(query, filename)
+            score = _score_subsequence_span(query_len, first, last)
+            subsequence.append((filename, filepath, score))
+
+    # 按得分取前 max_results 个结果
+    results = exact + prefix + contains + subsequence
+    return heapq.nlargest(max_results, results, key=itemgetter(2))
+
+
+def fuzzy_search_files(
+    query: str, file_cache: "FileCache", max_results: int = 20
+) -> List[Tuple[str, str, int]]:
+    """
+    在文件缓存中进行模糊搜索
+    返回格式: [(filename, filepath, score), ...]
+    """
+    if not query:
+        return []
+
+    query_lower = query.lower()
+    index = _get_search_index(file_cache)
+    # 所有匹配都是子序列匹配，先用正则筛出候选，再按匹配方式打分
+    pattern = compile_subsequence_pattern(query_lower)
+    matches = list(_search_subsequences(pattern, index))
+    return _rank_matches(query_lower, index, matches, max_results)
+
+
+class IncrementalSearcher:
+    """
+    增量模糊搜索
+    新查询是上一次查询的延伸时，匹配结果一定是上一次结果的子集，只需在上一次的结果中继续搜索
+    """
+
+    def __init__(self, file_cache: "FileCache"):
+        self._index = _get_search_index(file_cache)
+        self._last_query = ""
+        self._last_hits = self._index
+
+    def search(self, query: str, max_results: int = 20) -> List[Tuple[str, str, int]]:
+        """
+        在文件缓存中进行模糊搜索
+        返回格式: [(filename, filepath, score), ...]
+        """
+        if not query:
+            return []
+
+        query_lower = query.lower()
+        if self._last_query and query_lower.startswith(self._last_query):
+            index = self._last_hits
+        else:
+            index = self._index
+
+        pattern = compile_subsequence_pattern(query_lower)
+        matches = list(_search_subsequences(pattern, index))
 
-        if score > 0:
-            results.append((filename, filepath, score))
+        # 记录本次的全部命中结果，供后续延伸的查询使用
+        self._last_query = query_lower
+        hits = [i for i, _, _ in matches]
+        self._last_hits = _build_search_index(
+            [index.names[i] for i in hits],
+            [index.paths[i] for i in hits],
+            [index.lowers[i] for i in hits],
+        )
 
-    # 按得分排序并限制结果数量
-    results.sort(key=lambda x: x[2], reverse=True)
-    return results[:max_results]
+        return _rank_matches(query_lower, index, matches, max_results)
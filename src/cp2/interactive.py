@@ -4,7 +4,8 @@ import shutil
 import signal
 import sys
 from typing import List, Set, Tuple
-from .fuzzy_search import fuzzy_search_files
+from .fast_copy import fast_copy2
+from .fuzzy_search import IncrementalSearcher
 from .load_files import load_files_to_cache
 from .cp2_config import CP2Config
 from rich.console import Console
@@ -33,8 +34,11 @@ def interactive(cp2_config: CP2Config, console: Console) -> None:
 
     # search files
     console.print("[cyan]Initializing CP2...[/cyan]")
-    marks = cp2_config.list_marks()
-    marks = [mark for mark in marks.items() if mark[1]["path"] != target_path]
+    marks = tuple(
+        (name, info)
+        for name, info in cp2_config.list_marks().items()
+        if info["path"] != target_path
+    )
     if not marks:
         console.print("[yellow]No marks found. Please add some marks first.🤠[/yellow]")
         return
@@ -42,6 +46,7 @@ def interactive(cp2_config: CP2Config, console: Console) -> None:
     console.print("[cyan]Loading files from directory...[/cyan]")
     cache = load_files_to_cache(cp2_config, target_path)
     console.print(f"[green]✅ Found {len(cache)} files[/green]")
+    searcher = IncrementalSearcher(cache)
 
     console.print("[cyan]Starting interactive file selection...[/cyan]")
     selected_files: Set[Tuple[str, str, int]] = set()
@@ -59,7 +64,7 @@ def interactive(cp2_config: CP2Config, console: Console) -> None:
             break
 
         # Perform search in cache
-        results = fuzzy_search_files(query, cache)
+        results = searcher.search(query)
         if not results:
             console.print("[yellow]🧐 No files found matching your query.[/yellow]")
             continue
@@ -100,13 +105,14 @@ def interactive(cp2_config: CP2Config, console: Console) -> None:
         console.print("[yellow]😵 Operation cancelled.[/yellow]")
         return
 
+    dest_choices = [
+        questionary.Choice(title=f"{name} {info['path']}", value=info["path"])
+        for name, info in marks
+    ]
     while True:
         destinations = questionary.checkbox(
             "Where do you want to copy these files?",
-            choices=[
-                questionary.Choice(title=f"{name} {info['path']}", value=info["path"])
-                for name, info in marks
-            ],
+            choices=dest_choices,
         ).ask()
 
         # 检查目标选择是否被中断
@@ -130,16 +136,28 @@ def interactive(cp2_config: CP2Config, console: Console) -> None:
 
 def copy_files_to(target_path, console, selected_files, destinations):
     root_path = Path(target_path)
+    # 相对路径与目标无关，只计算一次
+    sources = []
+    for filename, filepath, score in selected_files:
+        source_path = Path(filepath)
+        sources.append((source_path, source_path.relative_to(root_path)))
+
+    # 多个文件常在同一目录下，目标目录去重后每个只创建一次
+    dirs_needed = {
+        Path(dest) / relative_path.parent
+        for dest in destinations
+        for source_path, relative_path in sources
+    }
+    for dir_path in sorted(dirs_needed, key=lambda p: len(p.parts)):
+        dir_path.mkdir(parents=True, exist_ok=True)
+
     for dest in destinations:
         dest_path = Path(dest)
 
-        for filename, filepath, score in selected_files:
-            source_path = Path(filepath)
-            relative_path = source_path.relative_to(root_path)
+        for source_path, relative_path in sources:
             target_file = dest_path / relative_path
-            target_file.parent.mkdir(parents=True, exist_ok=True)
 
-            shutil.copy2(source_path, target_file)
+            fast_copy2(source_path, target_file)
         console.print(f"[green]✅ Copied files to {dest}[/green]")
 
     console.print("[green]🎉 All files copied successfully! 🎉[/green]")
@@ -154,7 +172,7 @@ def copy_file_to(target_path, console, file_path, destinations):
         target_file = dest_path / relative_path
         target_file.parent.mkdir(parents=True, exist_ok=True)
 
-        shutil.copy2(file_path, target_file)
+        fast_copy2(file_path, target_file)
         console.print(f"[green]✅ Copied file to {dest}[/green]")
 
 
@@ -168,5 +186,7 @@ def copy_dir_to(target_path, console, dir_path, destinations):
         target_dir = dest_path / relative_path
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        shutil.copytree(source_path, target_dir, dirs_exist_ok=True)
+        shutil.copytree(
+            source_path, target_dir, copy_function=fast_copy2, dirs_exist_ok=True
+        )
         console.print(f"[green]✅ Copied directory to {dest}[/green]")
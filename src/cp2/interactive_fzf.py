@@ -1,11 +1,13 @@
 import os
 from pathlib import Path
-import shutil
 import signal
 import subprocess
 import sys
-from typing import List, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Set
 from .cp2_config import CP2Config
+from .fast_copy import fast_copy2
+from .load_files import build_matcher, walk
 from rich.console import Console
 from rich.table import Table
 from rich.box import HORIZONTALS
@@ -33,19 +35,32 @@ def interactive_fzf(cp2_config: CP2Config, console: Console) -> None:
 
     # search files
     console.print("[cyan]Initializing CP2...[/cyan]")
-    marks = cp2_config.list_marks()
-    marks = [mark for mark in marks.items() if mark[1]["path"] != target_path]
+    marks = tuple(
+        (name, info)
+        for name, info in cp2_config.list_marks().items()
+        if info["path"] != target_path
+    )
     if not marks:
         console.print("[yellow]No marks found. Please add some marks first.🤠[/yellow]")
         return
 
+    # 只遍历一次目录，之后每次选择都把同一份文件列表交给 fzf
+    console.print("[cyan]Loading files from directory...[/cyan]")
+    matcher = build_matcher(
+        cp2_config.get_ignore_file(), cp2_config.get_exclude_patterns()
+    )
+    prefix_len = len(os.path.join(target_path, ""))
+    file_paths = [path[prefix_len:] for path in walk(target_path, matcher)]
+    console.print(f"[green]✅ Found {len(file_paths)} files[/green]")
+    file_list = "\n".join(file_paths)
+
     console.print("[cyan]Starting interactive file selection...[/cyan]")
     selected_files: Set[str] = set()
 
     while True:
-        # select files by fd, fzf
+        # select files by fzf
         if not selected_files:
-            fzf_result = select_files_by_fzf(console)
+            fzf_result = select_files_by_fzf(console, file_list)
             if not fzf_result:
                 console.print("[yellow]No files selected.😓[/yellow]")
                 continue
@@ -71,7 +86,7 @@ def interactive_fzf(cp2_config: CP2Config, console: Console) -> None:
                 selected_files.clear()
                 continue
             elif query.lower() == "s":
-                fzf_result = select_files_by_fzf(console)
+                fzf_result = select_files_by_fzf(console, file_list)
                 if not fzf_result:
                     console.print("[yellow]No files selected.😓[/yellow]")
                     continue
@@ -86,13 +101,14 @@ def interactive_fzf(cp2_config: CP2Config, console: Console) -> None:
         console.print("[yellow]No files selected for copying. Exiting...👋[/yellow]")
         return
 
+    dest_choices = [
+        questionary.Choice(title=f"{name} {info['path']}", value=info["path"])
+        for name, info in marks
+    ]
     while True:
         destinations = questionary.checkbox(
             "Where do you want to copy these files?",
-            choices=[
-                questionary.Choice(title=f"{name} {info['path']}", value=info["path"])
-                for name, info in marks
-            ],
+            choices=dest_choices,
         ).ask()
 
         # 检查目标选择是否被中断
@@ -126,19 +142,24 @@ def preview_selected_file(console: Console, selected_files: Set[str]) -> None:
     console.print(table)
 
 
-def select_files_by_fzf(console: Console) -> List[str]:
+def select_files_by_fzf(console: Console, file_list: str) -> List[str]:
     """
     Use fzf to select files interactively.
-    command fd --type f | fzf --multi
+    file_list is the newline-separated list of paths fed to fzf's stdin.
     """
     try:
-        fzf_cmd = "fd --type f | fzf --multi"
-        fzf_result = subprocess.run(fzf_cmd, capture_output=True, text=True, shell=True)
-        if fzf_result.returncode == 0:
+        fzf_proc = subprocess.Popen(
+            ["fzf", "--multi"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        fzf_output, _ = fzf_proc.communicate(file_list)
+
+        if fzf_proc.returncode == 0:
             selected = [
-                line.strip()
-                for line in fzf_result.stdout.strip().split("\n")
-                if line.strip()
+                line.strip() for line in fzf_output.strip().split("\n") if line.strip()
             ]
             return selected
         else:
@@ -148,26 +169,51 @@ def select_files_by_fzf(console: Console) -> List[str]:
         raise SystemExit(f"Error running fzf: {e}")
     except FileNotFoundError:
         raise SystemExit(
-            "fzf or fd command not found. Please install them to use this feature."
+            "fzf command not found. Please install it to use this feature."
         )
 
 
 def copy_files_to(
     target_path: str,
     console: Console,
-    selected_files: Set[str],
+    selected_files: Iterable[str],
     destinations: List[str],
 ) -> None:
     root_path = Path(target_path)
+    # 多个 mark 可能指向同一目录，去重后避免两个线程同时写同一个文件
+    destinations = list(dict.fromkeys(destinations))
+
+    # 源路径与目标无关，只计算一次
+    sources = [
+        (root_path / relative_path, Path(relative_path))
+        for relative_path in selected_files
+    ]
+
+    copy_jobs = []
+    dirs_needed = set()
     for dest in destinations:
         dest_path = Path(dest)
 
-        for relative_path in selected_files:
-            source_path = root_path / relative_path
+        for source_path, relative_path in sources:
             target_file = dest_path / relative_path
-            target_file.parent.mkdir(parents=True, exist_ok=True)
-
-            shutil.copy2(source_path, target_file)
-        console.print(f"[green]✅ Copied files to {dest}[/green]")
+            dirs_needed.add(target_file.parent)
+            copy_jobs.append((dest, source_path, target_file))
+
+    # 先串行创建目录，避免多个线程同时创建同一目录；同一目录只创建一次
+    for dir_path in sorted(dirs_needed, key=lambda p: len(p.parts)):
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+    # 复制时大部分时间在等待 IO，用线程池让多个文件、多个目标同时进行
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(16, len(destinations) * 4))
+    ) as executor:
+        futures: Dict[str, List[Future]] = {dest: [] for dest in destinations}
+        for dest, source_path, target_file in copy_jobs:
+            futures[dest].append(executor.submit(fast_copy2, source_path, target_file))
+
+        for dest, dest_futures in futures.items():
+            for future in dest_futures:
+                future.result()
+            console.print(f"[green]✅ Copied files to {dest}[/green]")
 
     console.print("[green]🎉 All files copied successfully! 🎉[/green]")
@@ -1,26 +1,225 @@
 import os
-from typing import Dict, List
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from .cp2_config import CP2Config
-from gitignore_parser import parse_gitignore
+from pathspec import GitIgnoreSpec
 
+# 目录扫描主要等待 IO，线程数可以多于 CPU 核数
+_WALK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def init_gitignore_parser(root_dir: str, ignore_patterns: List[str]):
+# fd 可用时直接用它遍历目录
+_FD_PATH = shutil.which("fd")
+
+
+@dataclass
+class FileCache:
     """
-    Initialize the gitignore parser.
-    This function is a placeholder for any setup needed for gitignore parsing.
+    Files found under the target directory, stored as parallel lists.
+
+    names[i] is the basename of paths[i]; names_lower[i] is names[i].lower(),
+    precomputed once for the fuzzy search.
     """
-    # Create a temporary file with the patterns in the root directory
-    tmp_file_path = os.path.join(root_dir, ".gitignore.copy2.temp")
-    with open(tmp_file_path, "w") as tmp_file:
-        for pattern in ignore_patterns:
-            tmp_file.write(pattern + "\n")
 
-    matches = parse_gitignore(tmp_file_path)
+    names: List[str]
+    paths: List[str]
+    names_lower: List[str]
+
+    def __len__(self) -> int:
+        return len(self.names)
 
-    # Clean up the temporary file
-    os.unlink(tmp_file_path)
 
-    return matches
+def _glob_to_regex(glob: str) -> str:
+    """
+    Translate a name pattern that only uses the * and ? wildcards into a
+    regex; neither wildcard matches a path separator.
+    """
+    parts = []
+    for char in glob:
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=8)
+def compile_name_patterns(
+    patterns: Tuple[str, ...],
+) -> Tuple[Optional[re.Pattern], List[str]]:
+    """
+    Fold the gitignore patterns that only match on a bare name into one regex.
+
+    The regex is matched against a file name, or a directory name with a
+    trailing "/". Patterns with paths, negations, escapes or character classes
+    are returned unchanged, in order, for the full gitignore matcher; so is
+    everything before the last negation, so that the negation still applies.
+
+    :param patterns: gitignore patterns
+    :return: (name regex, or None if nothing could be folded, remaining patterns)
+    """
+    last_negation = max(
+        (i for i, pattern in enumerate(patterns) if pattern.startswith("!")),
+        default=-1,
+    )
+
+    alternatives = []
+    remaining = []
+    for i, pattern in enumerate(patterns):
+        name = pattern[:-1] if pattern.endswith("/") else pattern
+        if (
+            i < last_negation
+            or not name
+            or name != name.strip()
+            or name[0] in "#!"
+            or any(char in name for char in "/\\[")
+        ):
+            remaining.append(pattern)
+            continue
+        # 以 "/" 结尾的模式只匹配目录，其余模式同时匹配文件和目录
+        suffix = "/" if pattern.endswith("/") else "/?"
+        alternatives.append(_glob_to_regex(name) + suffix)
+
+    if not alternatives:
+        return None, remaining
+    return re.compile("(?:" + "|".join(alternatives) + r")\Z"), remaining
+
+
+@dataclass(frozen=True)
+class Matcher:
+    """
+    Compiled ignore rules, shared by every walk in this module.
+
+    Bare-name patterns are folded into name_regex (see compile_name_patterns);
+    the rest are compiled once into path_spec and matched against paths
+    relative to the walked root.
+    """
+
+    # 全部模式，按原顺序，交给 fd 使用
+    patterns: Tuple[str, ...]
+    name_regex: Optional[re.Pattern]
+    path_spec: Optional[GitIgnoreSpec]
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str]) -> "Matcher":
+        """Compile gitignore patterns into a Matcher."""
+        patterns = tuple(patterns)
+        name_regex, path_patterns = compile_name_patterns(patterns)
+        path_spec = GitIgnoreSpec.from_lines(path_patterns) if path_patterns else None
+        return cls(patterns, name_regex, path_spec)
+
+    def bind(self, root_dir: str) -> Callable[..., bool]:
+        """
+        Return a callable checking path_spec for paths under root_dir.
+
+        The callable takes a path (as produced by joining onto root_dir) and
+        whether it is a directory, since directory-only patterns like
+        "build/" must not match plain files.
+        """
+        spec = self.path_spec
+        if spec is None:
+            return lambda path, is_dir=False: False
+
+        prefix_len = len(os.path.join(root_dir, ""))
+
+        def matches(path: str, is_dir: bool = False) -> bool:
+            # pathspec 只接受以 "/" 分隔的相对路径，目录需要以 "/" 结尾
+            rel_path = path[prefix_len:]
+            if os.sep != "/":
+                rel_path = rel_path.replace(os.sep, "/")
+            return spec.match_file(rel_path + "/" if is_dir else rel_path)
+
+        return matches
+
+
+def _scan_dir(
+    path: str,
+    name_regex: Optional[re.Pattern],
+    matches: Callable[..., bool],
+) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """
+    List one directory and split it into (dirs, files) entries,
+    dropping everything that is ignored.
+    """
+    dirs: List[os.DirEntry] = []
+    files: List[os.DirEntry] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry)
+    except OSError:
+        return [], []
+
+    # 先用合并后的正则按名称排除，避免逐条匹配 gitignore 规则
+    if name_regex is not None:
+        dirs = [d for d in dirs if not name_regex.match(d.name + "/")]
+        files = [f for f in files if not name_regex.match(f.name)]
+
+    # 过滤目录和文件
+    dirs = [d for d in dirs if not matches(d.path, True)]
+    files = [f for f in files if not matches(f.path)]
+
+    return dirs, files
+
+
+def _walk_entries(
+    root_dir: str, matcher: Matcher
+) -> Iterator[Tuple[List[os.DirEntry], List[os.DirEntry]]]:
+    """
+    Walk root_dir top-down with os.scandir, yielding the (dirs, files) entries
+    not ignored by matcher for every directory in the same order as os.walk.
+
+    Directories are listed by a thread pool as soon as their parent has been
+    scanned, so readdir latency overlaps; results are still consumed in walk
+    order. Like os.walk, symlinks to directories are reported in dirs but not
+    followed.
+    """
+    name_regex = matcher.name_regex
+    matches = matcher.bind(root_dir)
+
+    executor = ThreadPoolExecutor(max_workers=_WALK_WORKERS)
+    try:
+        stack = [executor.submit(_scan_dir, root_dir, name_regex, matches)]
+        while stack:
+            dirs, files = stack.pop().result()
+            yield dirs, files
+
+            # 逆序入栈，保证出栈顺序与 os.walk 一致
+            stack.extend(
+                executor.submit(_scan_dir, d.path, name_regex, matches)
+                for d in reversed(dirs)
+                if not d.is_symlink()
+            )
+    finally:
+        # 调用方提前停止迭代时取消尚未开始的扫描
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def walk(root_dir: str, matcher: Matcher) -> Iterator[str]:
+    """
+    Yield the paths of all files under root_dir not ignored by matcher.
+
+    Uses fd when it is available and can express the rules, otherwise the
+    os.scandir walk.
+    """
+    fd_files = _fd_walk(root_dir, matcher.patterns)
+    if fd_files is not None:
+        yield from fd_files
+        return
+
+    for _, files in _walk_entries(root_dir, matcher):
+        for file in files:
+            yield file.path
 
 
 def filter_with_gitignore_parser(
@@ -30,42 +229,36 @@ def filter_with_gitignore_parser(
     Filter files and directories in the given root directory
     based on the provided gitignore patterns.
     """
-    matches = init_gitignore_parser(root_dir, ignore_patterns)
-
-    filtered_files = []
-    for root, dirs, files in os.walk(root_dir):
-        # 过滤目录
-        dirs[:] = [d for d in dirs if not matches(os.path.join(root, d))]
-
-        # 过滤文件
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not matches(file_path):
-                filtered_files.append(file_path)
-
-    return filtered_files
+    return list(walk(root_dir, Matcher.from_patterns(ignore_patterns)))
 
 
 def search_files_with_gitignore(
-    root_dir: str, search_term: str, ignore_patterns: List[str]
-) -> List[str]:
+    root_dir: str,
+    search_term: str,
+    ignore_patterns: List[str],
+    limit: Optional[int] = 200,
+) -> Iterator[str]:
     """
     Search for files in the given root directory that match the search term,
     while respecting the provided gitignore patterns.
+
+    Matches are yielded as they are found and the walk stops after limit
+    results (pass None to walk the whole tree).
     """
-    matches = init_gitignore_parser(root_dir, ignore_patterns)
-    results = []
-    for root, dirs, files in os.walk(root_dir):
-        # 过滤目录
-        dirs[:] = [d for d in dirs if not matches(os.path.join(root, d))]
+    if limit is not None and limit <= 0:
+        return
 
+    matcher = Matcher.from_patterns(ignore_patterns)
+    term_lower = search_term.lower()
+    found = 0
+    for _, files in _walk_entries(root_dir, matcher):
         # 搜索文件
         for file in files:
-            file_path = os.path.join(root, file)
-            if search_term.lower() in file.lower() and not matches(file_path):
-                results.append(file_path)
-
-    return results
+            if term_lower in file.name.lower():
+                yield file.path
+                found += 1
+                if found == limit:
+                    return
 
 
 def search_directory_with_gitignore(
@@ -75,21 +268,74 @@ def search_directory_with_gitignore(
     Search for directories in the given root directory that match the search term,
     while respecting the provided gitignore patterns.
     """
-    matches = init_gitignore_parser(root_dir, ignore_patterns)
+    matcher = Matcher.from_patterns(ignore_patterns)
+    term_lower = search_term.lower()
     results = []
-    for root, dirs, files in os.walk(root_dir):
-        # 过滤目录
-        dirs[:] = [d for d in dirs if not matches(os.path.join(root, d))]
-
+    for dirs, _ in _walk_entries(root_dir, matcher):
         # 搜索目录
-        for dir_name in dirs:
-            dir_path = os.path.join(root, dir_name)
-            if search_term.lower() in dir_name.lower() and not matches(dir_path):
-                results.append(dir_path)
+        for dir_entry in dirs:
+            if term_lower in dir_entry.name.lower():
+                results.append(dir_entry.path)
 
     return results
 
 
+def _fd_walk(root_dir: str, ignore_patterns: List[str]) -> Optional[List[str]]:
+    """
+    List the files under root_dir with fd, excluding ignore_patterns.
+
+    The result matches the os.scandir walk: symlinks to files (and broken
+    symlinks) are included, symlinks to directories are not. Paths are
+    sorted, since fd's parallel output has no stable order.
+
+    Returns None when fd is not installed, fails, or the patterns contain
+    negations (which fd's --exclude cannot express), so that the caller can
+    fall back to the Python walk.
+    """
+    if _FD_PATH is None or any(p.startswith("!") for p in ignore_patterns):
+        return None
+
+    # ignore 文件由调用方自行读取，不让 fd 再读取 .gitignore 等文件
+    fd_cmd = [_FD_PATH, "--hidden", "--no-ignore", "--print0"]
+    for pattern in ignore_patterns:
+        fd_cmd.extend(["--exclude", pattern])
+
+    # 普通文件和符号链接分开列出，只需要对符号链接判断是否指向目录
+    fd_procs: List[subprocess.Popen] = []
+    try:
+        for file_type in ("f", "l"):
+            fd_procs.append(
+                subprocess.Popen(
+                    fd_cmd + ["--type", file_type],
+                    cwd=root_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            )
+        outputs = [proc.communicate()[0] for proc in fd_procs]
+    except OSError:
+        for proc in fd_procs:
+            proc.kill()
+            proc.wait()
+        return None
+    if any(proc.returncode != 0 for proc in fd_procs):
+        return None
+
+    def split_paths(output: bytes) -> List[str]:
+        # 部分 fd 版本在管道输出时会加上 "./" 前缀
+        return [
+            os.path.join(root_dir, rel_path.removeprefix("./"))
+            for rel_path in os.fsdecode(output).split("\0")
+            if rel_path
+        ]
+
+    files = split_paths(outputs[0])
+    # 与 os.walk 一致，指向目录的符号链接不算作文件
+    files.extend(path for path in split_paths(outputs[1]) if not os.path.isdir(path))
+    files.sort()
+    return files
+
+
 def read_ignore_file(ignore_file: str) -> List[str]:
     """
     Read ignore patterns from a file.
@@ -105,24 +351,63 @@ def read_ignore_file(ignore_file: str) -> List[str]:
     return patterns
 
 
-def load_files_to_cache(
-    cp2_config: CP2Config, target_dir: str = os.getcwd()
-) -> Dict[str, str]:
-    """
-    Load files from the current directory into a cache.
+@lru_cache(maxsize=8)
+def _load_matcher(
+    ignore_file: str, mtime_ns: Optional[int], exclude_patterns: Tuple[str, ...]
+) -> Matcher:
     """
-    cache: Dict[str, str] = {}
+    Read the ignore file and compile it together with the exclude patterns.
 
-    ignore_patterns = read_ignore_file(cp2_config.get_ignore_file())
-    exclude_patterns = cp2_config.get_exclude_patterns()
+    mtime_ns is only part of the cache key, so that editing the ignore file
+    invalidates the cached matcher.
+    """
+    ignore_patterns = read_ignore_file(ignore_file)
     ignore_patterns.extend(exclude_patterns)
+    return Matcher.from_patterns(ignore_patterns)
+
+
+def build_matcher(ignore_file: str, exclude_patterns: Iterable[str]) -> Matcher:
+    """
+    Build the Matcher for an ignore file plus extra exclude patterns,
+    reusing the compiled result while the ignore file is unchanged.
+    """
+    # ignore 文件是相对当前目录的路径，缓存时使用绝对路径
+    ignore_file = os.path.abspath(ignore_file)
+    try:
+        mtime_ns = os.stat(ignore_file).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _load_matcher(ignore_file, mtime_ns, tuple(exclude_patterns))
 
-    filtered_files = filter_with_gitignore_parser(target_dir, ignore_patterns)
 
-    for file_path in filtered_files:
-        cache[os.path.basename(file_path)] = file_path
+def load_files_to_cache(
+    cp2_config: CP2Config, target_dir: str = os.getcwd()
+) -> FileCache:
+    """
+    Load files from the current directory into a cache.
 
-    return cache
+    Files are keyed by basename: when several files share a name, the last
+    one walked wins, at the position where the name was first seen.
+    """
+    matcher = build_matcher(
+        cp2_config.get_ignore_file(), cp2_config.get_exclude_patterns()
+    )
+
+    names: List[str] = []
+    paths: List[str] = []
+    # 文件名 -> 在 names/paths 中的下标
+    positions: Dict[str, int] = {}
+    for file_path in walk(target_dir, matcher):
+        name = os.path.basename(file_path)
+        pos = positions.get(name)
+        if pos is None:
+            positions[name] = len(names)
+            names.append(name)
+            paths.append(file_path)
+        else:
+            paths[pos] = file_path
+
+    return FileCache(names, paths, [name.lower() for name in names])
 
 
 def main():